@@ -6,26 +6,46 @@ Crawls Reddit for relevant discussions based on anonymized chat history context
 import os
 import json
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime, timedelta
+from dataclasses import dataclass, field
 import asyncio
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+import time
 from pathlib import Path
+import sqlite3
+import threading
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv()
 
 # MCP imports
+import anyio
 from mcp.server.fastmcp import FastMCP
 
+# Optional faster event loop (pip install uvloop, not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Reddit API wrapper
 import praw
 from praw.models import Submission, Comment
+from praw.endpoints import API_PATH
 import prawcore
+import requests
+from requests.adapters import HTTPAdapter
 
 # NLP for keyword extraction
 from collections import Counter
+import heapq
 import string
 
 # # Configure logging
@@ -33,13 +53,20 @@ import string
 # logger = logging.getLogger(__name__)
 
 # NEW - Log to file instead of console
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('reddit_mcp.log')  # Log to file, not console!
-    ]
+# Tool calls only enqueue records; a background listener thread does the file I/O
+_log_file_handler = logging.FileHandler('reddit_mcp.log')  # Log to file, not console!
+_log_file_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# The queue handler has no formatter of its own, the file handler formats records
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
 
 # Initialize the MCP server
@@ -50,15 +77,26 @@ REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID", "")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET", "")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "MCP Reddit Crawler v1.0")
 
+# Worker threads for blocking PRAW calls (also the size of the HTTP connection pool)
+MAX_WORKER_THREADS = 16
+
 # Initialize Reddit instance
 reddit = None
 try:
     if REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET:
+        # One keep-alive session shared by all tools, with a connection pool large
+        # enough that concurrent worker threads don't discard and re-open connections
+        http_session = requests.Session()
+        http_session.mount("https://", HTTPAdapter(
+            pool_connections=MAX_WORKER_THREADS,
+            pool_maxsize=MAX_WORKER_THREADS
+        ))
         reddit = praw.Reddit(
             client_id=REDDIT_CLIENT_ID,
             client_secret=REDDIT_CLIENT_SECRET,
             user_agent=REDDIT_USER_AGENT,
-            check_for_async=False
+            check_for_async=False,
+            requestor_kwargs={"session": http_session}
         )
         reddit.read_only = True
         logger.info("Reddit API initialized successfully")
@@ -67,117 +105,309 @@ try:
 except Exception as e:
     logger.error(f"Failed to initialize Reddit API: {e}")
 
+# Cap on concurrent Reddit requests issued from async tools
+MAX_CONCURRENT_REQUESTS = 8
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Shared worker threads for blocking PRAW calls, created once and reused by
+# every tool call so threads (and their pooled connections) stay warm
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS, thread_name_prefix="reddit-io")
+atexit.register(_executor.shutdown, wait=False)
+
+# Cached ISO timestamp for responses: [monotonic ns when formatted, iso string]
+TIMESTAMP_RESOLUTION_NS = 10_000_000  # 10ms
+_last_timestamp: List[Any] = [-TIMESTAMP_RESOLUTION_NS - 1, ""]
+
+# In-memory cache for find_relevant_subreddits: (keywords, limit) -> (expires at, subreddits)
+SUBREDDIT_CACHE_TTL = 3600  # seconds
+SUBREDDIT_CACHE_SIZE = 256
+_subreddit_cache: Dict[tuple, tuple] = {}
+_subreddit_cache_lock = threading.Lock()  # Lookups run on several worker threads
+
+# On-disk cache for find_relevant_subreddits, shared across server restarts
+SUBREDDIT_DB_PATH = 'reddit_cache.db'
+SUBREDDIT_DB_TTL = 86400  # seconds
+SUBREDDIT_DB_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS subreddit_cache "
+    "(key TEXT PRIMARY KEY, subreddits TEXT NOT NULL, created REAL NOT NULL)"
+)
+_subreddit_db_lock = threading.Lock()
+_subreddit_db = None
+try:
+    _subreddit_db = sqlite3.connect(SUBREDDIT_DB_PATH, check_same_thread=False)
+    _subreddit_db.execute(SUBREDDIT_DB_SCHEMA)
+    _subreddit_db.commit()
+except sqlite3.Error as e:
+    _subreddit_db = None
+    logger.warning(f"Subreddit cache database unavailable, caching in memory only: {e}")
+
+# Common words to filter out of keyword extraction
+STOP_WORDS = frozenset({
+    'the', 'is', 'at', 'which', 'on', 'and', 'a', 'an', 'as', 'are', 'was',
+    'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'shall', 'to', 'of', 'in',
+    'for', 'with', 'by', 'from', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'between', 'under', 'again',
+    'further', 'then', 'once', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours',
+    'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him',
+    'his', 'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself',
+    'they', 'them', 'their', 'theirs', 'themselves', 'what', 'who', 'whom',
+    'this', 'that', 'these', 'those', 'am', 'were', 'being', 'having', 'doing',
+    'can', 'dont', 'just', 'not', 'only', 'very', 'too', 'also', 'than', 'so',
+    'if', 'but'
+})
+
+# Translation table that strips punctuation
+_PUNCT_TRANS = str.maketrans('', '', string.punctuation)
+
+# Placeholders inserted by anonymize_text (never useful as keywords)
+_PLACEHOLDER_RE = re.compile(r'\[(?:NAME|EMAIL|PHONE|USER|URL)\]')
+
+# Personal information patterns, combined so text is scanned only once
+# URLs come first so an '@' inside a link is not mistaken for an email
+_PII_RE = re.compile(
+    r'(?P<url>http[s]?://\S+)'
+    r'|(?P<email>\S+@\S+)'
+    r'|(?P<user>@\w+)'
+    r'|(?P<phone>\b\d{3}[-.]?\d{3}[-.]?\d{4}\b)'
+)
+_DIGIT_RE = re.compile(r'\d')
+_PII_PLACEHOLDERS = {
+    'url': '[URL]',
+    'email': '[EMAIL]',
+    'user': '[USER]',
+    'phone': '[PHONE]',
+}
+
+# Word that follows another word in the same sentence (so not a sentence
+# starter), skipping the pronoun "I" and words starting with a lowercase ASCII
+# letter or digit. Whether the rest are capitalized is checked in
+# _replace_name so any Unicode capital counts, not just A-Z
+_NAME_RE = re.compile(r'(?<=[^.\s])(\s+)(?!I\b)(?![a-z0-9])([^\s.]+)')
+
+# Result records
+@dataclass(slots=True)
+class CommentResult:
+    """A top comment of a Reddit submission (already anonymized)"""
+    text: str
+    score: int
+
+@dataclass(slots=True)
+class SubmissionResult:
+    """A Reddit submission matched by a search, with its top comments"""
+    subreddit: str
+    title: str
+    url: str
+    score: int
+    num_comments: int
+    created_utc: float
+    selftext: str
+    comments: List[CommentResult] = field(default_factory=list)
+
 # Helper functions
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """
     Extract keywords from anonymized chat history
     Removes common words and focuses on meaningful terms
     """
-    # Common words to filter out
-    stop_words = {
-        'the', 'is', 'at', 'which', 'on', 'and', 'a', 'an', 'as', 'are', 'was',
-        'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-        'could', 'should', 'may', 'might', 'must', 'shall', 'to', 'of', 'in',
-        'for', 'with', 'by', 'from', 'about', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'under', 'again', 'further', 'then',
-        'once', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
-        'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself',
-        'she', 'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them',
-        'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this',
-        'that', 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'been', 'being',
-        'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'would',
-        'could', 'should', 'may', 'might', 'must', 'shall', 'can', 'will', 'dont',
-        'just', 'not', 'only', 'very', 'too', 'also', 'than', 'so', 'if', 'but'
-    }
-    
-    # Convert to lowercase and remove punctuation
-    text_lower = text.lower()
-    translator = str.maketrans('', '', string.punctuation)
-    text_clean = text_lower.translate(translator)
-    
-    # Split into words
-    words = text_clean.split()
-    
-    # Filter out stop words and short words
-    meaningful_words = [
-        word for word in words 
-        if word not in stop_words and len(word) > 2
-    ]
+    # Results are cached, hand back a fresh list so callers can't mutate the cache
+    return list(_extract_keywords_cached(text, max_keywords))
+
+@lru_cache(maxsize=1024)
+def _extract_keywords_cached(text: str, max_keywords: int) -> tuple:
+    """
+    Keyword extraction behind extract_keywords, cached on the input text
+    """
+    # Drop placeholders left by anonymize_text, then convert to lowercase and
+    # remove punctuation
+    text_clean = _PLACEHOLDER_RE.sub(' ', text).lower().translate(_PUNCT_TRANS)
     
-    # Count word frequency
-    word_freq = Counter(meaningful_words)
+    # Tokenize and count words longer than 2 characters, then remove stop
+    # words once per distinct word instead of once per occurrence
+    word_freq = Counter(word for word in text_clean.split() if len(word) > 2)
+    for word in STOP_WORDS.intersection(word_freq):
+        del word_freq[word]
     
     # Get most common keywords
-    keywords = [word for word, _ in word_freq.most_common(max_keywords)]
-    
-    return keywords
+    return tuple(word for word, _ in word_freq.most_common(max_keywords))
+
+def _replace_name(match: re.Match) -> str:
+    """
+    Replace a _NAME_RE match with [NAME] if the word is capitalized
+    """
+    if match.group(2)[0].isupper():
+        return match.group(1) + '[NAME]'
+    return match.group(0)
 
+@lru_cache(maxsize=1024)
 def anonymize_text(text: str) -> str:
     """
     Remove any potential personal information from text
     """
-    # Remove email addresses
-    text = re.sub(r'\S+@\S+', '[EMAIL]', text)
-    
-    # Remove phone numbers (various formats)
-    text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-    text = re.sub(r'\b\d{10}\b', '[PHONE]', text)
-    
-    # Remove potential social media handles
-    text = re.sub(r'@\w+', '[USER]', text)
-    
-    # Remove URLs
-    text = re.sub(r'http[s]?://\S+', '[URL]', text)
+    # Remove URLs, email addresses, social media handles and phone numbers
+    # Each of these needs an '@', a link or a digit, so most chat messages can
+    # skip the (comparatively slow) combined scan after a few cheap checks
+    if '@' in text or 'http' in text or _DIGIT_RE.search(text):
+        text = _PII_RE.sub(lambda match: _PII_PLACEHOLDERS[match.lastgroup], text)
     
     # Remove potential names (capitalized words that aren't sentence starters)
     # This is a simple heuristic and may not catch all names
-    sentences = text.split('.')
-    for i, sentence in enumerate(sentences):
-        words = sentence.split()
-        for j, word in enumerate(words):
-            if j > 0 and word[0].isupper() and word.lower() not in ['i']:
-                words[j] = '[NAME]'
-        sentences[i] = ' '.join(words)
-    text = '. '.join(sentences)
+    text = _NAME_RE.sub(_replace_name, text)
     
     return text
 
-def search_reddit_by_keywords(keywords: List[str], limit: int = 20) -> List[Dict]:
+def dedupe_keywords(keywords: List[str]) -> List[str]:
+    """
+    Drop keywords that repeat an earlier one, ignoring case and a plural 's'
+    Keeps the first occurrence so keyword order (relevance) is preserved
+    """
+    seen = set()
+    unique = []
+    for keyword in keywords:
+        base = keyword.lower()
+        if len(base) > 4 and base.endswith('s'):
+            base = base[:-1]
+        if base not in seen:
+            seen.add(base)
+            unique.append(keyword)
+    return unique
+
+def load_cached_subreddits(cache_key: tuple) -> Optional[tuple]:
+    """
+    Look up subreddits stored on disk for a (keywords, limit) key
+    Returns (subreddits, created time), or None on a miss or when the entry is
+    older than SUBREDDIT_DB_TTL
+    """
+    if _subreddit_db is None:
+        return None
+    
+    try:
+        with _subreddit_db_lock:
+            row = _subreddit_db.execute(
+                "SELECT subreddits, created FROM subreddit_cache WHERE key = ? AND created > ?",
+                (json.dumps(cache_key), time.time() - SUBREDDIT_DB_TTL)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error reading subreddit cache: {e}")
+        return None
+    
+    return (json.loads(row[0]), row[1]) if row else None
+
+def remember_subreddits(cache_key: tuple, subreddits: List[str], created: float) -> None:
+    """
+    Keep subreddits in the bounded in-memory cache
+    The entry expires after SUBREDDIT_CACHE_TTL, but never later than the
+    on-disk entry it came from (created + SUBREDDIT_DB_TTL)
+    """
+    expires_at = min(time.time() + SUBREDDIT_CACHE_TTL, created + SUBREDDIT_DB_TTL)
+    with _subreddit_cache_lock:
+        _subreddit_cache.pop(cache_key, None)
+        if len(_subreddit_cache) >= SUBREDDIT_CACHE_SIZE:
+            _subreddit_cache.pop(next(iter(_subreddit_cache)))  # Drop the oldest entry
+        _subreddit_cache[cache_key] = (expires_at, tuple(subreddits))
+
+def store_cached_subreddits(cache_key: tuple, subreddits: List[str]) -> None:
+    """
+    Save subreddits for a (keywords, limit) key and evict expired entries
+    """
+    if _subreddit_db is None:
+        return
+    
+    now = time.time()
+    try:
+        with _subreddit_db_lock, _subreddit_db:
+            _subreddit_db.execute(
+                "INSERT OR REPLACE INTO subreddit_cache (key, subreddits, created) VALUES (?, ?, ?)",
+                (json.dumps(cache_key), json.dumps(subreddits), now)
+            )
+            _subreddit_db.execute(
+                "DELETE FROM subreddit_cache WHERE created <= ?",
+                (now - SUBREDDIT_DB_TTL,)
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Error writing subreddit cache: {e}")
+
+def iso_now() -> str:
+    """
+    Current local time as an ISO string, reformatted at most every 10ms
+    """
+    now_ns = time.monotonic_ns()
+    if now_ns - _last_timestamp[0] > TIMESTAMP_RESOLUTION_NS:
+        _last_timestamp[:] = [now_ns, datetime.now().isoformat()]
+    return _last_timestamp[1]
+
+async def run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking function (e.g. a PRAW request) on the shared worker threads
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args))
+
+def get_top_comments(submission: Submission, limit: int = 5) -> List[CommentResult]:
+    """
+    Fetch the top comments of a submission and anonymize them
+    This is a blocking call - run it in a worker thread from async code
+    """
+    comments = []
+    
+    # Request only the top-level comments we keep (depth=1) instead of letting
+    # submission.comments download the full default comment tree
+    _, comment_listing = reddit.get(
+        API_PATH["submission"].format(id=submission.id),
+        params={"limit": limit, "depth": 1, "sort": "confidence"}
+    )
+    for comment in comment_listing.children[:limit]:
+        # Filter out very short comments before paying for anonymization
+        if isinstance(comment, Comment) and len(comment.body) > 20:
+            comment_text = anonymize_text(comment.body)
+            if len(comment_text) > 20:  # Placeholders can shorten the text
+                comments.append(CommentResult(text=comment_text, score=comment.score))
+    return comments
+
+async def fetch_comments_concurrently(submissions: List[Submission]) -> List[List[CommentResult]]:
+    """
+    Fetch top comments for all submissions at once instead of one after another
+    Concurrency is capped so we stay within Reddit's rate limits
+    """
+    async def fetch(submission: Submission) -> List[CommentResult]:
+        async with _request_semaphore:
+            return await run_blocking(get_top_comments, submission)
+    
+    return await asyncio.gather(*(fetch(submission) for submission in submissions))
+
+async def search_reddit_by_keywords(keywords: List[str], limit: int = 20) -> List[SubmissionResult]:
     """
     Search Reddit for relevant discussions based on keywords
     """
     if not reddit:
         raise Exception("Reddit API not initialized")
     
+    if limit <= 0:
+        return []
+    
     results = []
-    search_query = ' '.join(keywords[:5])  # Use top 5 keywords for search
+    search_query = ' '.join(dedupe_keywords(keywords)[:5])  # Use top 5 keywords for search
     
     try:
-        # Search across all of Reddit
-        for submission in reddit.subreddit("all").search(search_query, limit=limit, sort="relevance"):
-            result = {
-                'subreddit': submission.subreddit.display_name,
-                'title': submission.title,
-                'url': f"https://reddit.com{submission.permalink}",
-                'score': submission.score,
-                'num_comments': submission.num_comments,
-                'created_utc': submission.created_utc,
-                'selftext': submission.selftext[:500] if submission.selftext else "",
-                'comments': []
-            }
-            
-            # Get top comments (limited to avoid rate limiting)
-            submission.comments.replace_more(limit=0)
-            for comment in submission.comments[:5]:
-                if isinstance(comment, Comment):
-                    comment_text = anonymize_text(comment.body)
-                    if len(comment_text) > 20:  # Filter out very short comments
-                        result['comments'].append({
-                            'text': comment_text,
-                            'score': comment.score
-                        })
-            
-            results.append(result)
+        # Search across all of Reddit (PRAW is blocking, so keep it off the event loop)
+        submissions = await run_blocking(
+            lambda: list(reddit.subreddit("all").search(search_query, limit=limit, sort="relevance"))
+        )
+        
+        # Get top comments for every submission in one concurrent wave
+        all_comments = await fetch_comments_concurrently(submissions)
+        
+        for submission, comments in zip(submissions, all_comments):
+            results.append(SubmissionResult(
+                subreddit=submission.subreddit.display_name,
+                title=submission.title,
+                url=f"https://reddit.com{submission.permalink}",
+                score=submission.score,
+                num_comments=submission.num_comments,
+                created_utc=submission.created_utc,
+                selftext=submission.selftext[:500] if submission.selftext else "",
+                comments=comments
+            ))
             
     except prawcore.exceptions.ResponseException as e:
         logger.error(f"Reddit API error: {e}")
@@ -195,58 +425,77 @@ def find_relevant_subreddits(keywords: List[str], limit: int = 10) -> List[str]:
     if not reddit:
         raise Exception("Reddit API not initialized")
     
+    # Subreddits for a keyword set are stable for hours, reuse recent lookups
+    query_keywords = tuple(dedupe_keywords(keywords)[:3])
+    cache_key = (query_keywords, limit)
+    with _subreddit_cache_lock:
+        cached = _subreddit_cache.get(cache_key)
+    if cached and time.time() < cached[0]:
+        return list(cached[1])
+    
+    # Fall back to the on-disk cache, which survives server restarts
+    stored = load_cached_subreddits(cache_key)
+    if stored is not None:
+        stored_subreddits, created = stored
+        remember_subreddits(cache_key, stored_subreddits, created)
+        return stored_subreddits
+    
     subreddits = set()
     
     try:
         # Search for subreddits
-        for subreddit in reddit.subreddits.search(' '.join(keywords[:3]), limit=limit):
+        for subreddit in reddit.subreddits.search(' '.join(query_keywords), limit=limit):
             subreddits.add(subreddit.display_name)
     except Exception as e:
         logger.error(f"Error finding subreddits: {e}")
+        return list(subreddits)
+    
+    remember_subreddits(cache_key, list(subreddits), time.time())
+    store_cached_subreddits(cache_key, list(subreddits))
     
     return list(subreddits)
 
-def format_reddit_results(results: List[Dict], max_results: int = 10) -> Dict:
+def format_reddit_results(results: List[SubmissionResult], max_results: int = 10) -> Dict:
     """
     Format Reddit results into structured JSON
     """
-    # Sort by relevance (score + number of comments)
-    sorted_results = sorted(
-        results, 
-        key=lambda x: x['score'] + x['num_comments'], 
-        reverse=True
-    )[:max_results]
+    # Keep only the most relevant results (score + number of comments)
+    sorted_results = heapq.nlargest(
+        max_results,
+        results,
+        key=lambda x: x.score + x.num_comments
+    )
     
     formatted_results = []
     for result in sorted_results:
         formatted_result = {
-            'subreddit': result['subreddit'],
-            'title': result['title'],
-            'url': result['url'],
-            'relevance_score': result['score'] + result['num_comments'],
+            'subreddit': result.subreddit,
+            'title': result.title,
+            'url': result.url,
+            'relevance_score': result.score + result.num_comments,
             'discussions': []
         }
         
         # Add main post content if available
-        if result['selftext']:
+        if result.selftext:
             formatted_result['discussions'].append({
                 'type': 'post',
-                'content': result['selftext'],
-                'score': result['score']
+                'content': result.selftext,
+                'score': result.score
             })
         
         # Add comments
-        for comment in result['comments']:
+        for comment in result.comments:
             formatted_result['discussions'].append({
                 'type': 'comment',
-                'content': comment['text'],
-                'score': comment['score']
+                'content': comment.text,
+                'score': comment.score
             })
         
         formatted_results.append(formatted_result)
     
     return {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': iso_now(),
         'results_count': len(formatted_results),
         'reddit_discussions': formatted_results
     }
@@ -254,7 +503,7 @@ def format_reddit_results(results: List[Dict], max_results: int = 10) -> Dict:
 # MCP Tools
 
 @mcp.tool()
-def crawl_reddit_from_chat(
+async def crawl_reddit_from_chat(
     chat_history: str,
     max_results: int = 10,
     search_subreddits: bool = True
@@ -278,7 +527,8 @@ def crawl_reddit_from_chat(
                 'status': 'error'
             }
         
-        # Anonymize the chat history
+        # Anonymize the chat history (keywords are sent to Reddit, so this
+        # must run first to keep personal details out of the search query)
         anonymized_chat = anonymize_text(chat_history)
         
         # Extract keywords from chat history
@@ -290,16 +540,21 @@ def crawl_reddit_from_chat(
                 'status': 'error'
             }
         
-        # Search Reddit
-        reddit_results = search_reddit_by_keywords(keywords, limit=max_results * 2)
+        # Search Reddit and find relevant subreddits (if requested) concurrently
+        search_task = search_reddit_by_keywords(keywords, limit=max_results * 2)
+        if search_subreddits:
+            reddit_results, relevant_subreddits = await asyncio.gather(
+                search_task,
+                run_blocking(find_relevant_subreddits, keywords)
+            )
+        else:
+            reddit_results = await search_task
         
         # Format results
         formatted_results = format_reddit_results(reddit_results, max_results)
         formatted_results['extracted_keywords'] = keywords
         
-        # Find relevant subreddits if requested
         if search_subreddits:
-            relevant_subreddits = find_relevant_subreddits(keywords)
             formatted_results['suggested_subreddits'] = relevant_subreddits
         
         formatted_results['status'] = 'success'
@@ -313,7 +568,7 @@ def crawl_reddit_from_chat(
         }
 
 @mcp.tool()
-def search_reddit_keywords(
+async def search_reddit_keywords(
     keywords: List[str],
     subreddit: Optional[str] = None,
     max_results: int = 10,
@@ -342,33 +597,27 @@ def search_reddit_keywords(
         search_sub = reddit.subreddit(subreddit) if subreddit else reddit.subreddit("all")
         
         # Build search query
-        search_query = ' '.join(keywords)
+        search_query = ' '.join(dedupe_keywords(keywords))
+        
+        submissions = await run_blocking(
+            lambda: list(search_sub.search(search_query, limit=max_results, time_filter=time_filter, sort="relevance"))
+        )
+        
+        # Get top comments for every submission in one concurrent wave
+        all_comments = await fetch_comments_concurrently(submissions)
         
         results = []
-        for submission in search_sub.search(search_query, limit=max_results, time_filter=time_filter, sort="relevance"):
-            result = {
-                'subreddit': submission.subreddit.display_name,
-                'title': submission.title,
-                'url': f"https://reddit.com{submission.permalink}",
-                'score': submission.score,
-                'num_comments': submission.num_comments,
-                'created_utc': submission.created_utc,
-                'selftext': anonymize_text(submission.selftext[:500]) if submission.selftext else "",
-                'comments': []
-            }
-            
-            # Get top comments
-            submission.comments.replace_more(limit=0)
-            for comment in submission.comments[:5]:
-                if isinstance(comment, Comment):
-                    comment_text = anonymize_text(comment.body)
-                    if len(comment_text) > 20:
-                        result['comments'].append({
-                            'text': comment_text,
-                            'score': comment.score
-                        })
-            
-            results.append(result)
+        for submission, comments in zip(submissions, all_comments):
+            results.append(SubmissionResult(
+                subreddit=submission.subreddit.display_name,
+                title=submission.title,
+                url=f"https://reddit.com{submission.permalink}",
+                score=submission.score,
+                num_comments=submission.num_comments,
+                created_utc=submission.created_utc,
+                selftext=anonymize_text(submission.selftext[:500]) if submission.selftext else "",
+                comments=comments
+            ))
         
         # Format and return results
         formatted_results = format_reddit_results(results, max_results)
@@ -386,8 +635,37 @@ def search_reddit_keywords(
             'status': 'error'
         }
 
+def get_subreddit_details(subreddit: Any) -> Dict[str, Any]:
+    """
+    Fetch the basic details of a subreddit (blocking)
+    """
+    # Build info dict - access properties directly
+    return {
+        'name': subreddit.display_name,
+        'title': subreddit.title,
+        'description': subreddit.public_description[:500] if hasattr(subreddit, 'public_description') and subreddit.public_description else "",
+        'subscribers': subreddit.subscribers if hasattr(subreddit, 'subscribers') else 0,
+        'created_utc': subreddit.created_utc if hasattr(subreddit, 'created_utc') else 0,
+        'over18': subreddit.over18 if hasattr(subreddit, 'over18') else False,
+        'status': 'success'
+    }
+
+def get_recent_top_posts(subreddit: Any, limit: int = 5) -> List[Dict]:
+    """
+    Fetch the current hot posts of a subreddit (blocking)
+    """
+    recent_posts = []
+    for submission in subreddit.hot(limit=limit):
+        recent_posts.append({
+            'title': submission.title,
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'url': f"https://reddit.com{submission.permalink}"
+        })
+    return recent_posts
+
 @mcp.tool()
-def get_subreddit_info(subreddit_name: str) -> Dict[str, Any]:
+async def get_subreddit_info(subreddit_name: str) -> Dict[str, Any]:
     """Get information about a specific subreddit."""
     try:
         if not reddit:
@@ -396,29 +674,14 @@ def get_subreddit_info(subreddit_name: str) -> Dict[str, Any]:
                 'status': 'error'
             }
         
-        # Get the subreddit
+        # Get the subreddit (lazy - no request is made until attributes are read)
         subreddit = reddit.subreddit(subreddit_name)
         
-        # Build info dict - access properties directly
-        info = {
-            'name': subreddit.display_name,
-            'title': subreddit.title,
-            'description': subreddit.public_description[:500] if hasattr(subreddit, 'public_description') and subreddit.public_description else "",
-            'subscribers': subreddit.subscribers if hasattr(subreddit, 'subscribers') else 0,
-            'created_utc': subreddit.created_utc if hasattr(subreddit, 'created_utc') else 0,
-            'over18': subreddit.over18 if hasattr(subreddit, 'over18') else False,
-            'status': 'success'
-        }
-        
-        # Get recent top posts - this part was causing issues
-        recent_posts = []
-        for submission in subreddit.hot(limit=5):
-            recent_posts.append({
-                'title': submission.title,
-                'score': submission.score,
-                'num_comments': submission.num_comments,
-                'url': f"https://reddit.com{submission.permalink}"
-            })
+        # Details and hot posts are separate requests, so fetch them together
+        info, recent_posts = await asyncio.gather(
+            run_blocking(get_subreddit_details, subreddit),
+            run_blocking(get_recent_top_posts, subreddit)
+        )
         
         info['recent_top_posts'] = recent_posts
         
@@ -432,14 +695,17 @@ def get_subreddit_info(subreddit_name: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-def test_reddit_connection() -> Dict[str, Any]:
+async def test_reddit_connection() -> Dict[str, Any]:
     """Test if Reddit connection is working"""
     try:
         if not reddit:
             return {"status": "error", "message": "Reddit object is None"}
         
         # Try to access Reddit front page
-        for submission in reddit.subreddit("all").hot(limit=1):
+        submission = await run_blocking(
+            lambda: next(iter(reddit.subreddit("all").hot(limit=1)), None)
+        )
+        if submission:
             return {
                 "status": "success",
                 "message": "Reddit connection working!",
@@ -458,8 +724,12 @@ def main():
         logger.warning("Reddit API credentials not configured.")
         logger.warning("Using read-only mode without authentication")
     
-    # Run the server
-    asyncio.run(mcp.run())
+    # Run the server (FastMCP owns the event loop and awaits async tools)
+    if uvloop is not None:
+        # Same as mcp.run() for stdio, but on the faster uvloop event loop
+        anyio.run(mcp.run_stdio_async, backend_options={"use_uvloop": True})
+    else:
+        mcp.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
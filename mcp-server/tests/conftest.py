@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Importing main opens reddit_cache.db and reddit_mcp.log in the working
+# directory, so run the tests from a scratch directory instead of sharing the
+# real cache and log
+os.chdir(tempfile.mkdtemp(prefix='mcp-server-tests-'))
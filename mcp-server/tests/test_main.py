@@ -0,0 +1,104 @@
+import sqlite3
+import sys
+
+import pytest
+
+import main
+
+
+def test_anonymize_text_replaces_non_latin1_names():
+    assert main.anonymize_text('Yesterday I met Łukasz and Šárka') == 'Yesterday I met [NAME] and [NAME]'
+    assert main.anonymize_text('Я вчера встретил Ивана') == 'Я вчера встретил [NAME]'
+    assert main.anonymize_text('I talked to Ōtani') == 'I talked to [NAME]'
+
+
+def test_anonymize_text_keeps_sentence_starters_and_pronoun_i():
+    assert main.anonymize_text('Hello there Bob. Then I left') == 'Hello there [NAME]. Then I left'
+
+
+def test_extract_keywords_skips_placeholders_but_keeps_real_words():
+    keywords = main.extract_keywords(
+        main.anonymize_text('I need help with my user account email login name change url. Ask Bob at bob@x.io')
+    )
+    assert {'user', 'email', 'name', 'url'} <= set(keywords)
+    assert 'bob' not in keywords
+    assert main.extract_keywords('[NAME] [EMAIL] [PHONE] [USER] [URL] python') == ['python']
+
+
+def test_remember_subreddits_is_bounded_and_respects_disk_age(monkeypatch):
+    monkeypatch.setattr(main, '_subreddit_cache', {})
+    now = main.time.time()
+    for i in range(main.SUBREDDIT_CACHE_SIZE + 50):
+        main.remember_subreddits((('kw', str(i)), 10), ['sub'], now)
+    assert len(main._subreddit_cache) == main.SUBREDDIT_CACHE_SIZE
+
+    # A disk row that is almost SUBREDDIT_DB_TTL old must not get a fresh hour
+    old_created = now - main.SUBREDDIT_DB_TTL + 60
+    main.remember_subreddits((('old',), 10), ['sub'], old_created)
+    expires_at, _ = main._subreddit_cache[(('old',), 10)]
+    assert expires_at <= old_created + main.SUBREDDIT_DB_TTL
+
+
+def test_remember_subreddits_is_thread_safe(monkeypatch):
+    monkeypatch.setattr(main, '_subreddit_cache', {})
+    monkeypatch.setattr(main, 'SUBREDDIT_CACHE_SIZE', 4)
+    now = main.time.time()
+
+    def fill(worker):
+        for i in range(2000):
+            main.remember_subreddits(((str(worker), str(i)), 10), ['sub'], now)
+
+    # Switch threads as often as possible so an unlocked evict would race
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with main.ThreadPoolExecutor(max_workers=16) as pool:
+            for future in [pool.submit(fill, worker) for worker in range(16)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(main._subreddit_cache) <= main.SUBREDDIT_CACHE_SIZE
+
+
+@pytest.fixture
+def subreddit_db(monkeypatch):
+    db = sqlite3.connect(':memory:', check_same_thread=False)
+    db.execute(main.SUBREDDIT_DB_SCHEMA)
+    monkeypatch.setattr(main, '_subreddit_db', db)
+    yield db
+    db.close()
+
+
+def test_subreddit_db_round_trip(subreddit_db, monkeypatch):
+    monkeypatch.setattr(main.time, 'time', lambda: 1000.0)
+    key = (('python', 'help'), 10)
+    assert main.load_cached_subreddits(key) is None
+
+    main.store_cached_subreddits(key, ['learnpython', 'python'])
+    assert main.load_cached_subreddits(key) == (['learnpython', 'python'], 1000.0)
+
+
+def test_subreddit_db_skips_and_deletes_expired_rows(subreddit_db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'time', lambda: now[0])
+    old_key = (('old',), 10)
+    main.store_cached_subreddits(old_key, ['old'])
+
+    # Still fresh just before SUBREDDIT_DB_TTL, skipped on read once it passes
+    now[0] += main.SUBREDDIT_DB_TTL - 1
+    assert main.load_cached_subreddits(old_key) == (['old'], 1000.0)
+    now[0] += 1
+    assert main.load_cached_subreddits(old_key) is None
+    assert subreddit_db.execute("SELECT COUNT(*) FROM subreddit_cache").fetchone()[0] == 1
+
+    # The next write deletes it
+    main.store_cached_subreddits((('new',), 10), ['new'])
+    keys = [row[0] for row in subreddit_db.execute("SELECT key FROM subreddit_cache")]
+    assert keys == [main.json.dumps((('new',), 10))]
+
+
+def test_subreddit_db_unavailable(monkeypatch):
+    monkeypatch.setattr(main, '_subreddit_db', None)
+    key = (('python',), 10)
+    main.store_cached_subreddits(key, ['python'])
+    assert main.load_cached_subreddits(key) is None